@@ -2,14 +2,23 @@ from web3 import Web3
 from decimal import Decimal
 import base58
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import argparse
 from datetime import datetime, timedelta
 import pytz
 import csv
+import io
+import re
 import sys
 import os
 import time
-import shelve
+import sqlite3
+import threading
+import functools
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
 
 # --- CONFIGURATION ---
 RPC_URL = "https://eth-mainnet.g.alchemy.com/v2/??????????"
@@ -29,6 +38,10 @@ REBASE_CONTROLLER_ADDRESS = "0x1711e93eec78ba83D38C26f0fF284eB478bdbec4"
 TIME_OF_DAY = "13:00:00"
 DEFAULT_START_DATE = "2023-10-19"
 DEFAULT_START_BLOCK = 18385225
+# Concurrent block fetches; sized to stay within typical provider rate limits.
+MAX_WORKERS = 10
+# CSV rows buffered before each writerows() flush to stdout.
+_CSV_FLUSH_ROWS = 64
 
 # --- CONTRACT ABI for the Data Provider ---
 DATA_PROVIDER_ABI = [
@@ -101,8 +114,52 @@ ERC20_ABI = [
     }
 ]
 
-# Initialize Web3 connection
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+# --- Multicall3 (canonical deployment) for aggregating eth_calls ---
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Call3[]", "name": "calls", "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Result[]", "name": "returnData", "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+# Shared HTTP session: keep-alive connection pooling plus retries with
+# backoff for transient errors, reused by every endpoint we talk to.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_maxsize=2 * MAX_WORKERS,
+    max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+))
+# CoinGecko rate-limits aggressively; give it a longer retry budget and
+# honor its Retry-After header instead of hand-rolled sleep loops.
+_session.mount("https://api.coingecko.com/", HTTPAdapter(
+    pool_maxsize=2 * MAX_WORKERS,
+    max_retries=Retry(total=10, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504],
+                      respect_retry_after_header=True)
+))
+
+# Initialize Web3 connection (RPC traffic reuses the shared session)
+w3 = Web3(Web3.HTTPProvider(RPC_URL, session=_session))
 
 # Verify connection
 if not w3.is_connected():
@@ -112,17 +169,91 @@ if not w3.is_connected():
 data_provider_contract = w3.eth.contract(address=w3.to_checksum_address(STAKE_CONTRACT_ADDRESS), abi=DATA_PROVIDER_ABI)
 link_token_contract = w3.eth.contract(address=w3.to_checksum_address(LINK_TOKEN_ADDRESS), abi=ERC20_ABI)
 stlink_token_contract = w3.eth.contract(address=w3.to_checksum_address(stLINK_TOKEN_ADDRESS), abi=ERC20_ABI)
+multicall3_contract = w3.eth.contract(address=w3.to_checksum_address(MULTICALL3_ADDRESS), abi=MULTICALL3_ABI)
+
+# Checksummed once at load: to_checksum_address keccaks the hex on every
+# call, which compounds across thousands of loop iterations.
+USER_WALLET_CS = w3.to_checksum_address(USER_WALLET_ADDRESS)
+
+@functools.lru_cache(maxsize=8)
+def _checksum(address: str) -> str:
+    return w3.to_checksum_address(address)
 
 def uint256_to_decimal(n: int, decimals: int = 18) -> Decimal:
     return Decimal(n) / (10 ** decimals)
 
-block_timestamp_cache = {}
-
+def _multicall(calls: list[tuple[str, str]], block_number: int) -> list[bytes | None]:
+    """Aggregate several reads into one eth_call via Multicall3.
+
+    calls is a list of (target_address, calldata_hex) pairs. Returns the
+    raw return bytes per call, in call order, with None for sub-calls the
+    contract reported as failed (allowFailure=True). All reads are atomic
+    at the same block.
+    """
+    packed = [(target, True, bytes.fromhex(data[2:])) for target, data in calls]
+    results = multicall3_contract.functions.aggregate3(packed).call(block_identifier=block_number)
+    return [bytes(return_data) if success else None for success, return_data in results]
+
+# Single on-disk cache, opened once for the whole run. WAL + NORMAL sync
+# avoids the per-lookup open/fsync cost the old shelve files paid.
+_cache_conn = sqlite3.connect("cache.db", check_same_thread=False)
+_cache_conn.executescript(
+    "PRAGMA journal_mode=WAL;"
+    "PRAGMA synchronous=NORMAL;"
+    "CREATE TABLE IF NOT EXISTS block_ts(n INTEGER PRIMARY KEY, ts INTEGER);"
+    "CREATE TABLE IF NOT EXISTS price(d TEXT PRIMARY KEY, p REAL);"
+)
+_cache_lock = threading.Lock()
+
+# Warm the in-memory map with everything already cached on disk: one
+# SELECT at startup makes every later hit an O(1) dict lookup.
+block_timestamp_cache = dict(_cache_conn.execute("SELECT n, ts FROM block_ts"))
+
+
+def _get_block_timestamp_rpc(block_identifier) -> int:
+    """Timestamp via raw eth_getBlockByNumber with full_transactions=False.
+
+    Bypasses w3.eth.get_block's full-block decode: only the header is
+    returned and only the timestamp field gets parsed.
+    """
+    if isinstance(block_identifier, int):
+        block_identifier = hex(block_identifier)
+    header = w3.manager.request_blocking("eth_getBlockByNumber", [block_identifier, False])
+    return int(header['timestamp'], 16)
+
+def get_block_number_for_timestamp_etherscan(target_timestamp: int) -> int | None:
+    """Resolve a timestamp to a block number in one Etherscan call.
+
+    Returns None on any failure so the caller can fall back to the
+    binary search over eth_getBlock.
+    """
+    params = {
+        "module": "block",
+        "action": "getblocknobytime",
+        "timestamp": target_timestamp,
+        "closest": "after",
+        "apikey": ETHERSCAN_API_KEY
+    }
+    try:
+        response = _session.get("https://api.etherscan.io/api", params=params, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        if data['status'] == '0':
+            return None
+        return int(data['result'])
+    except Exception:
+        return None
 
 def get_block_number_for_timestamp(w3, target_timestamp):
-    latest_block = w3.eth.get_block('latest')
-    latest_timestamp = latest_block['timestamp']
-    latest_number = latest_block['number']
+    # One HTTP call via Etherscan replaces up to ~24 sequential
+    # eth_getBlock probes; the binary search below remains as a fallback.
+    block_number = get_block_number_for_timestamp_etherscan(target_timestamp)
+    if block_number is not None:
+        return block_number
+
+    latest_block = w3.manager.request_blocking("eth_getBlockByNumber", ['latest', False])
+    latest_timestamp = int(latest_block['timestamp'], 16)
+    latest_number = int(latest_block['number'], 16)
 
     if target_timestamp > latest_timestamp:
         raise ValueError("Target timestamp is in the future")
@@ -134,162 +265,348 @@ def get_block_number_for_timestamp(w3, target_timestamp):
         if mid in block_timestamp_cache:
             mid_timestamp = block_timestamp_cache[mid]
         else:
-            mid_block = w3.eth.get_block(mid)
-            mid_timestamp = mid_block['timestamp']
-            block_timestamp_cache[mid] = mid_timestamp
+            mid_timestamp = _get_block_timestamp_rpc(mid)
+            _remember_block_timestamp(mid, mid_timestamp)
         if mid_timestamp < target_timestamp:
             low = mid + 1
         else:
             high = mid
     if low not in block_timestamp_cache:
-        block_timestamp_cache[low] = w3.eth.get_block(low)['timestamp']
+        _remember_block_timestamp(low, _get_block_timestamp_rpc(low))
     return low
 
+def _remember_block_timestamp(block_num, timestamp):
+    """Write-behind: record a freshly fetched timestamp in both caches."""
+    block_timestamp_cache[block_num] = timestamp
+    with _cache_lock, _cache_conn:
+        _cache_conn.execute("INSERT OR REPLACE INTO block_ts(n, ts) VALUES (?, ?)", (block_num, timestamp))
+
+def prefetch_block_timestamps(block_nums: list[int], csv_mode: bool = False) -> None:
+    """Resolve every uncached block timestamp before the main loop.
+
+    Posts eth_getBlockByNumber requests as JSON-RPC batches in chunks of
+    100, so N cache misses cost ceil(N/100) round-trips instead of N.
+    Results land in both caches; get_block_timestamp then degrades to a
+    dict lookup.
+    """
+    missing = sorted(n for n in set(block_nums) if n not in block_timestamp_cache)
+    if not missing:
+        return
+
+    chunk_size = 100
+    for i in range(0, len(missing), chunk_size):
+        chunk = missing[i:i + chunk_size]
+        batch = [{"jsonrpc": "2.0", "id": n, "method": "eth_getBlockByNumber",
+                  "params": [hex(n), False]} for n in chunk]
+        try:
+            response = _session.post(RPC_URL, json=batch, timeout=30)
+            response.raise_for_status()
+            items = response.json()
+        except Exception as e:
+            if not csv_mode:
+                print(f"Error prefetching block timestamps: {e}", file=sys.stderr)
+            return
+
+        if not isinstance(items, list):
+            # Providers that reject batch requests answer with a single
+            # JSON-RPC error object; bail out and let the per-block path
+            # in get_block_timestamp take over.
+            if not csv_mode:
+                print(f"Error prefetching block timestamps: unexpected batch response: {items}", file=sys.stderr)
+            return
+
+        rows = []
+        for item in items:
+            result = item.get('result')
+            if result and 'error' not in item:
+                rows.append((item['id'], int(result['timestamp'], 16)))
+        block_timestamp_cache.update(rows)
+        with _cache_lock, _cache_conn:
+            _cache_conn.executemany("INSERT OR REPLACE INTO block_ts(n, ts) VALUES (?, ?)", rows)
+
 def get_block_timestamp(block_num):
-    with shelve.open('block_timestamp_cache.db') as cache:
-        if str(block_num) in cache:  # Keys must be strings in Shelve
-            return cache[str(block_num)]
-        else:
-            timestamp = w3.eth.get_block(block_num)['timestamp']
-            cache[str(block_num)] = timestamp
-            return timestamp
+    timestamp = block_timestamp_cache.get(block_num)
+    if timestamp is not None:
+        return timestamp
+    timestamp = _get_block_timestamp_rpc(block_num)
+    _remember_block_timestamp(block_num, timestamp)
+    return timestamp
+
+def prefetch_link_prices(start_ts: int, end_ts: int, currency: str = 'usd', csv_mode: bool = False) -> None:
+    """Fetch daily LINK prices for the whole run in one CoinGecko call.
+
+    market_chart/range returns every daily price between the two
+    timestamps, so a single request (and a single rate-limit delay)
+    replaces one history call per rewards block. Results are upserted
+    into the price cache; get_link_price then hits the cache.
+    """
+    try:
+        time.sleep(1)  # same politeness delay as the per-date endpoint
+        url = "https://api.coingecko.com/api/v3/coins/chainlink/market_chart/range"
+        params = {"vs_currency": currency.lower(), "from": start_ts, "to": end_ts}
+        response = _session.get(url, params=params, timeout=30)
+        response.raise_for_status()
+        prices = response.json().get('prices', [])
+    except Exception as e:
+        if not csv_mode:
+            print(f"Error prefetching LINK prices: {e}", file=sys.stderr)
+        return
+
+    # Ranges of 90 days or less come back with intraday granularity rather
+    # than one point per day; keep only the first point of each day (the
+    # 00:00 UTC snapshot, which is what the per-date /history fallback
+    # reports) so prefetched and fallback prices agree.
+    rows = {}
+    for ts_ms, price in prices:
+        date = datetime.fromtimestamp(ts_ms / 1000, tz=pytz.UTC).strftime("%d-%m-%Y")
+        rows.setdefault(f"{date}_{currency}", float(price))
+    with _cache_lock, _cache_conn:
+        _cache_conn.executemany("INSERT OR REPLACE INTO price(d, p) VALUES (?, ?)", rows.items())
 
 def get_link_price(date: str, currency: str = 'usd', csv_mode: bool = False) -> float:
     cache_key = f"{date}_{currency}"
-    with shelve.open('price_cache.db') as cache:
-        if cache_key in cache:
-            return cache[cache_key]
-        
-        max_retries = 10
-        retry_count = 0
-        
-        while retry_count < max_retries:
-            time.sleep(1)  # 1-second delay for every request
-            
-            try:
-                url = f"https://api.coingecko.com/api/v3/coins/chainlink/history?date={date}&localization=false"
-                response = requests.get(url, timeout=10)
-                
-                if response.status_code == 429:
-                    retry_count += 1
-                    time.sleep(10)
-                    if not csv_mode:
-                        print(f"Rate limit hit for {date}, retry {retry_count}/{max_retries}", file=sys.stderr)
-                    continue
-                    
-                response.raise_for_status()
-                data = response.json()
-                
-                price = float(data['market_data']['current_price'][currency.lower()])
-                cache[cache_key] = price  # Store in Shelve
-                return price
-                
-            except requests.exceptions.RequestException as e:
-                if not csv_mode:
-                    print(f"Error fetching LINK price for {date}: {e}", file=sys.stderr)
-                return 0.0
-            except Exception as e:
-                if not csv_mode:
-                    print(f"Unexpected error fetching LINK price for {date} in {currency.upper()}: {e}", file=sys.stderr)
-                return 0.0
-        
+    with _cache_lock:
+        row = _cache_conn.execute("SELECT p FROM price WHERE d = ?", (cache_key,)).fetchone()
+    if row is not None:
+        return row[0]
+
+    time.sleep(1)  # 1-second delay for every request
+
+    try:
+        # Rate-limit retries and backoff are handled by the Retry policy
+        # mounted on the session for api.coingecko.com.
+        url = f"https://api.coingecko.com/api/v3/coins/chainlink/history?date={date}&localization=false"
+        response = _session.get(url, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+
+        price = float(data['market_data']['current_price'][currency.lower()])
+        with _cache_lock, _cache_conn:
+            _cache_conn.execute("INSERT OR REPLACE INTO price(d, p) VALUES (?, ?)", (cache_key, price))
+        return price
+
+    except requests.exceptions.RequestException as e:
+        if not csv_mode:
+            print(f"Error fetching LINK price for {date}: {e}", file=sys.stderr)
+        return 0.0
+    except Exception as e:
         if not csv_mode:
-            print(f"Max retries reached for {date}", file=sys.stderr)
+            print(f"Unexpected error fetching LINK price for {date} in {currency.upper()}: {e}", file=sys.stderr)
         return 0.0
 
-def fetch_ipfs_data(cid: str, wallet_address: str, csv_mode: bool = False) -> tuple[int, int]:
+_ADDRESS_RE = re.compile(r'0x[0-9a-fA-F]{40}\Z')
+
+def _index_addresses(node, index: dict) -> None:
+    """Collect every address-keyed entry in the document into index,
+    keyed by lowercase address."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if isinstance(key, str) and _ADDRESS_RE.match(key):
+                index.setdefault(key.lower(), value)
+            else:
+                _index_addresses(value, index)
+    elif isinstance(node, list):
+        for item in node:
+            _index_addresses(item, index)
+
+def _parse_uint(value) -> int:
+    return int(value, 0) if isinstance(value, str) else int(value)
+
+@functools.lru_cache(maxsize=64)
+def _ipfs_address_index(cid: str) -> dict:
+    """Download one IPFS document and index it by lowercase address.
+
+    Memoized by CID: the ipfsHash only changes on rebase events, so many
+    consecutive blocks share a CID. The one-pass index replaces a full
+    document scan (and the old whole-text lowercase copy) per lookup.
+    """
     gateway_url = f"https://ipfs.io/ipfs/{cid}"
+    response = _session.get(gateway_url, timeout=10)
+    response.raise_for_status()
+    # Let the C JSON parser handle the document instead of walking the
+    # raw text character-by-character in Python.
+    index: dict = {}
+    _index_addresses(response.json(), index)
+    return index
+
+def _fetch_ipfs_amounts(cid: str, wallet_lower: str) -> tuple[int, int] | None:
+    entry = _ipfs_address_index(cid).get(wallet_lower)
+    if entry is None:
+        return None
+    fields = {k.lower(): v for k, v in entry.items()}
+    return _parse_uint(fields['amount']), _parse_uint(fields['sharesamount'])
+
+def fetch_ipfs_data(cid: str, wallet_address: str, csv_mode: bool = False) -> tuple[int, int]:
     try:
-        response = requests.get(gateway_url, timeout=10)
-        response.raise_for_status()
-        ipfs_text = response.text.lower()
-        
-        start_index = ipfs_text.find(wallet_address.lower())
-        if start_index == -1:
-            if not csv_mode:
-                print(f"Address {wallet_address} not found in IPFS data (yet)")
-            return 0, 0
-            
-        brace_start = ipfs_text.find("{", start_index)
-        if brace_start == -1:
-            raise ValueError("Malformed data: No opening brace found after address")
-            
-        brace_count = 1
-        end_index = brace_start + 1
-        while end_index < len(ipfs_text) and brace_count > 0:
-            if ipfs_text[end_index] == "{":
-                brace_count += 1
-            elif ipfs_text[end_index] == "}":
-                brace_count -= 1
-            end_index += 1
-            
-        if brace_count != 0:
-            raise ValueError("Malformed data: Mismatched braces")
-            
-        data_str = ipfs_text[brace_start:end_index].replace('\\"', '"')
-        
-        amount_start = data_str.find('"amount":"') + len('"amount":"')
-        amount_end = data_str.find('"', amount_start)
-        distribution_amount = int(data_str[amount_start:amount_end], 0)
-        
-        shares_start = data_str.find('"sharesamount":"') + len('"sharesamount":"')
-        shares_end = data_str.find('"', shares_start)
-        shares_amount = int(data_str[shares_start:shares_end], 0)
-        
-        return distribution_amount, shares_amount
-        
+        amounts = _fetch_ipfs_amounts(cid, wallet_address.lower())
     except requests.exceptions.RequestException as e:
         raise ValueError(f"Error fetching IPFS data: {e}")
-    except ValueError as e:
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
         raise ValueError(f"Invalid amount or sharesAmount value: {e}")
 
-def get_wallet_balances(wallet_address: str, block_number: int, csv_mode: bool = False) -> dict:
-    checksum_wallet = w3.to_checksum_address(wallet_address)
-    
-    result = {
-        'stlink_balance': -1,
-        'link_balance': -1,
-        'lsd_tokens': 0,
-        'queued_tokens': 0
-    }
-    
-    try:
-        raw_hash = data_provider_contract.functions.ipfsHash().call(block_identifier=block_number)
-        prefix = bytes([0x12, 0x20])
-        full_multihash = prefix + raw_hash
-        cid = base58.b58encode(full_multihash).decode('utf-8')
-        
-        distribution_amount, shares_amount = fetch_ipfs_data(cid, wallet_address, csv_mode)
-        
-        result['lsd_tokens'] = data_provider_contract.functions.getLSDTokens(
-            checksum_wallet, shares_amount
-        ).call(block_identifier=block_number)
-        
-        result['queued_tokens'] = data_provider_contract.functions.getQueuedTokens(
-            checksum_wallet, distribution_amount
-        ).call(block_identifier=block_number)
-                
-    except Exception as e:
+    if amounts is None:
         if not csv_mode:
-            print(f"Error processing IPFS or contract calls at block {block_number}: {e}")
-    
+            print(f"Address {wallet_address} not found in IPFS data (yet)")
+        return 0, 0
+    return amounts
+
+_IPFS_HASH_CALLDATA = data_provider_contract.encodeABI(fn_name="ipfsHash")
+
+@functools.lru_cache(maxsize=8)
+def _balance_calls(checksum_wallet: str) -> tuple:
+    """Calldata for the block-independent reads, encoded once per wallet.
+
+    The same (target, calldata) pairs are valid at every block, so the ABI
+    encoding cost is paid once instead of once per loop iteration.
+    """
+    return (
+        (stlink_token_contract.address,
+         stlink_token_contract.encodeABI(fn_name="balanceOf", args=[checksum_wallet])),
+        (link_token_contract.address,
+         link_token_contract.encodeABI(fn_name="balanceOf", args=[checksum_wallet])),
+    )
+
+def _raw_hash_to_cid(raw_hash: bytes) -> str:
+    return base58.b58encode(bytes([0x12, 0x20]) + raw_hash[:32]).decode('utf-8')
+
+# Piecewise-constant map of rebase boundary block -> distribution CID.
+# ipfsHash() only changes on RebaseController updates, whose blocks we
+# already know, so the per-block on-chain read can usually be skipped.
+# A None value marks an interval whose boundary read failed; those blocks
+# keep using the per-block on-chain fallback.
+_cid_boundaries: list[int] = []
+_cid_values: list[str | None] = []
+
+def build_cid_map(start_block: int, rewards_blocks: list[int], csv_mode: bool = False) -> None:
+    """Resolve ipfsHash() once per rebase interval instead of per block."""
+    for boundary in sorted({start_block, *rewards_blocks}):
+        try:
+            raw_hash = data_provider_contract.functions.ipfsHash().call(block_identifier=boundary)
+            cid = _raw_hash_to_cid(raw_hash)
+        except Exception as e:
+            if not csv_mode:
+                print(f"Error reading ipfsHash at block {boundary}: {e}", file=sys.stderr)
+            # The previous interval's CID must not spill over an unresolved
+            # boundary; mark the interval unknown instead.
+            cid = None
+        if not _cid_values or _cid_values[-1] != cid:
+            _cid_boundaries.append(boundary)
+            _cid_values.append(cid)
+
+def _cid_at_block(block_number: int) -> str | None:
+    """Active CID for a block per the prebuilt map, or None when unknown."""
+    idx = bisect.bisect_right(_cid_boundaries, block_number) - 1
+    return _cid_values[idx] if idx >= 0 else None
+
+@functools.lru_cache(maxsize=8)
+def _amount_call_prefixes(checksum_wallet: str) -> tuple[str, str]:
+    """Selector + wallet prefix for getLSDTokens/getQueuedTokens.
+
+    Only the trailing uint256 amount varies per block; appending it as 32
+    hex-encoded bytes avoids re-running the ABI encoder in the hot path.
+    """
+    lsd = data_provider_contract.encodeABI(fn_name="getLSDTokens", args=[checksum_wallet, 0])
+    queued = data_provider_contract.encodeABI(fn_name="getQueuedTokens", args=[checksum_wallet, 0])
+    return lsd[:-64], queued[:-64]
+
+class Balances(NamedTuple):
+    """Raw uint256 balances for one wallet at one block.
+
+    -1 marks a failed balance read, matching the old dict sentinel.
+    """
+    stlink: int = -1
+    link: int = -1
+    lsd: int = 0
+    queued: int = 0
+
+def get_wallet_balances(wallet_address: str, block_number: int, csv_mode: bool = False) -> Balances:
+    checksum_wallet = _checksum(wallet_address)
+
+    stlink_balance = -1
+    link_balance = -1
+    lsd_tokens = 0
+    queued_tokens = 0
+
+    # The interval map usually already knows the CID; only fall back to an
+    # on-chain ipfsHash() read for blocks outside the mapped range.
+    cid = _cid_at_block(block_number)
+
+    calls = list(_balance_calls(checksum_wallet))
+    if cid is None:
+        calls.append((data_provider_contract.address, _IPFS_HASH_CALLDATA))
+
     try:
-        result['stlink_balance'] = stlink_token_contract.functions.balanceOf(
-            checksum_wallet
-        ).call(block_identifier=block_number)
+        # First multicall: everything that doesn't depend on the IPFS document.
+        results = _multicall(calls, block_number)
     except Exception as e:
         if not csv_mode:
-            print(f"Error querying stLINK balance at block {block_number}: {e}")
-    
+            print(f"Error aggregating contract calls at block {block_number}: {e}")
+        return Balances()
+
+    stlink_raw, link_raw = results[0], results[1]
+    if stlink_raw is not None:
+        stlink_balance = int.from_bytes(stlink_raw, 'big')
+    if link_raw is not None:
+        link_balance = int.from_bytes(link_raw, 'big')
+
     try:
-        result['link_balance'] = link_token_contract.functions.balanceOf(
-            checksum_wallet
-        ).call(block_identifier=block_number)
+        if cid is None:
+            ipfs_hash_raw = results[2]
+            if ipfs_hash_raw is None:
+                raise ValueError("ipfsHash() call failed")
+            cid = _raw_hash_to_cid(ipfs_hash_raw)
+
+        distribution_amount, shares_amount = fetch_ipfs_data(cid, wallet_address, csv_mode)
+
+        # Second multicall: the two calls that need amounts from the IPFS document.
+        lsd_prefix, queued_prefix = _amount_call_prefixes(checksum_wallet)
+        calls = [
+            (data_provider_contract.address, lsd_prefix + f"{shares_amount:064x}"),
+            (data_provider_contract.address, queued_prefix + f"{distribution_amount:064x}"),
+        ]
+        lsd_raw, queued_raw = _multicall(calls, block_number)
+
+        if lsd_raw is not None:
+            lsd_tokens = int.from_bytes(lsd_raw, 'big')
+        if queued_raw is not None:
+            queued_tokens = int.from_bytes(queued_raw, 'big')
+
     except Exception as e:
         if not csv_mode:
-            print(f"Error querying LINK balance at block {block_number}: {e}")
-    
-    return result
+            print(f"Error processing IPFS or contract calls at block {block_number}: {e}")
+
+    return Balances(stlink_balance, link_balance, lsd_tokens, queued_tokens)
+
+_ETHERSCAN_PAGE_SIZE = 10000
+
+def _etherscan_paged(params: dict, csv_mode: bool = False) -> list[dict]:
+    """Fetch every page of an Etherscan list endpoint.
+
+    Etherscan silently caps unpaginated queries at 10k rows; loop over
+    explicit page/offset params until a short page signals the end.
+    """
+    rows = []
+    page = 1
+    while True:
+        page_params = dict(params, page=page, offset=_ETHERSCAN_PAGE_SIZE)
+        response = _session.get("https://api.etherscan.io/api", params=page_params)
+        response.raise_for_status()
+        data = response.json()
+
+        if data['status'] == '0':
+            # On the first page this is a real "nothing found" / error;
+            # on later pages it just means we ran off the end.
+            if page == 1 and not csv_mode:
+                print(f"Etherscan API Message: {data['message']}")
+                print(f"Result: {data.get('result', 'N/A')}")
+            break
+
+        page_rows = data['result']
+        rows.extend(page_rows)
+        if len(page_rows) < _ETHERSCAN_PAGE_SIZE:
+            break
+        page += 1
+    return rows
 
 def fetch_token_transactions(wallet_address: str, STAKE_CONTRACT_ADDRESS: str, start_block: int, csv_mode: bool = False) -> list[tuple[int, str]]:
     wallet_addr_lower = wallet_address.lower()
@@ -306,18 +623,10 @@ def fetch_token_transactions(wallet_address: str, STAKE_CONTRACT_ADDRESS: str, s
     }
 
     try:
-        response = requests.get("https://api.etherscan.io/api", params=params)
-        response.raise_for_status()
-        data = response.json()
-
-        if data['status'] == '0':
-            if not csv_mode:
-                print(f"Etherscan API Message: {data['message']}")
-                print(f"Result: {data.get('result', 'N/A')}")
-            return []
-
-        transactions = data['result']
-        block_types = set()
+        transactions = _etherscan_paged(params, csv_mode)
+        # Coalesce by block number (first-seen type wins) so a block with
+        # several matching transfers yields a single record to process.
+        block_types: dict[int, str] = {}
 
         for tx in transactions:
             tx_from = tx['from'].lower()
@@ -329,12 +638,12 @@ def fetch_token_transactions(wallet_address: str, STAKE_CONTRACT_ADDRESS: str, s
             if is_outgoing or is_incoming:
                 block_number = int(tx['blockNumber'])
                 tx_type = "Stake" if is_outgoing else "Withdraw"
-                block_types.add((block_number, tx_type))
+                block_types.setdefault(block_number, tx_type)
                 if not csv_mode:
                     token_symbol = tx['tokenSymbol']
                     print(f"Found {tx_type} transfer of {token_symbol} in Block #{tx['blockNumber']} from {tx['from']} to {tx['to']}")
 
-        return list(block_types)
+        return list(block_types.items())
 
     except requests.exceptions.RequestException as e:
         if not csv_mode:
@@ -355,24 +664,16 @@ def fetch_update_rewards_blocks(rebase_controller_address: str, start_block: int
         "endblock": 99999999,
         "sort": "asc",
         "apikey": ETHERSCAN_API_KEY
-    }    
+    }
     try:
-        response = requests.get("https://api.etherscan.io/api", params=params)
-        response.raise_for_status()
-        data = response.json()
-        if data['status'] == '0':
-            if not csv_mode:
-                print(f"Etherscan API Message: {data['message']}")
-                print(f"Result: {data.get('result', 'N/A')}")
-            return []
-        blocks = set()
-        for tx in data['result']:
+        blocks: dict[int, str] = {}
+        for tx in _etherscan_paged(params, csv_mode):
             if tx['to'].lower() == rebase_controller_lower and tx['input'].startswith(method_id):
                 block_number = int(tx['blockNumber'])
-                blocks.add((block_number, "Rewards"))
+                blocks.setdefault(block_number, "Rewards")
                 if not csv_mode:
                     print(f"Found 'Rewards' transaction in Block #{tx['blockNumber']}")
-        return list(blocks)
+        return list(blocks.items())
     except Exception as e:
         if not csv_mode:
             print(f"Error fetching 'Rewards' transactions: {e}")
@@ -402,6 +703,13 @@ def get_monday_block_numbers(start_date: datetime, end_date: datetime, TIME_OF_D
     
     return blocks
 
+def fetch_block(block_num: int, block_type: str, csv_mode: bool = False) -> dict:
+    """Fetch balances and timestamp for one block. Runs on the worker pool;
+    the IO-bound RPC/IPFS calls release the GIL so blocks overlap."""
+    balances = get_wallet_balances(USER_WALLET_CS, block_num, csv_mode)
+    timestamp = None if block_type == "Baseline" else get_block_timestamp(block_num)
+    return {'balances': balances, 'timestamp': timestamp}
+
 def main():
     parser = argparse.ArgumentParser(description="Fetch wallet balances at specific blocks")
     parser.add_argument(
@@ -429,19 +737,21 @@ def main():
         # --- Use a dynamic end date for queries ---
         end_date = datetime.now(utc)       
 
+        # Resolve the start date/block once, then fetch the wallet's
+        # transactions a single time for either path.
+        start_date = datetime.strptime(args.datefrom, "%Y-%m-%d").replace(tzinfo=utc)
+        start_timestamp = int(start_date.timestamp())
+        start_block = get_block_number_for_timestamp(w3, start_timestamp)
+
+        transaction_blocks = fetch_token_transactions(
+            USER_WALLET_ADDRESS,
+            STAKE_CONTRACT_ADDRESS,
+            start_block,
+            args.csv
+        )
+
         if args.datefrom == DEFAULT_START_DATE:
             # Default behavior: find the first transaction and start from there
-            default_start_date = datetime.strptime(DEFAULT_START_DATE, "%Y-%m-%d").replace(tzinfo=utc)
-            start_timestamp = int(default_start_date.timestamp())
-            start_block = get_block_number_for_timestamp(w3, start_timestamp)
-            
-            transaction_blocks = fetch_token_transactions(
-                USER_WALLET_ADDRESS,
-                STAKE_CONTRACT_ADDRESS,
-                start_block,
-                args.csv
-            )
-            
             if not transaction_blocks:
                 if not args.csv:
                     raise ValueError("No stake/withdraw transactions found for the given wallet since the default start date.")
@@ -453,35 +763,27 @@ def main():
             earliest_block = min(block_num for block_num, _ in transaction_blocks)
             earliest_timestamp = get_block_timestamp(earliest_block)
             start_date = datetime.fromtimestamp(earliest_timestamp, tz=utc)
-        else:
-            # User specified a start date
-            start_date = datetime.strptime(args.datefrom, "%Y-%m-%d").replace(tzinfo=utc)
-            start_timestamp = int(start_date.timestamp())
-            start_block = get_block_number_for_timestamp(w3, start_timestamp)
-            
-            transaction_blocks = fetch_token_transactions(
-                USER_WALLET_ADDRESS,
-                STAKE_CONTRACT_ADDRESS,
-                start_block,
-                args.csv
-            )
-        
-        
+
         monday_blocks = get_monday_block_numbers(start_date, end_date, TIME_OF_DAY)
         
         # This function is the single source of truth for reward events.
         method_id = "0x128606a6"
         update_rewards_blocks = fetch_update_rewards_blocks(REBASE_CONTROLLER_ADDRESS, start_block, method_id, args.csv)
+
+        # ipfsHash() is constant between rebase events; resolve it once per
+        # interval so the per-block fetches can skip the on-chain read.
+        build_cid_map(start_block, [block_num for block_num, _ in update_rewards_blocks], args.csv)
         
         # --- FIX 2: De-duplicate the combined list to ensure each block is processed only once. ---
-        # This prevents issues if multiple functions ever find the same event block.
-        combined_blocks = monday_blocks+ transaction_blocks + update_rewards_blocks
-        unique_blocks = sorted(
-            list(set(combined_blocks)),
-            key=lambda x: x[0]
-        )
-        
-        all_blocks = unique_blocks
+        # Coalesce by block number so a block found by several sources is
+        # fetched exactly once. Transaction types take precedence over
+        # "Rewards": a stake/withdraw in the same block would corrupt the
+        # reward delta, matching the old two-row behavior that zeroed it.
+        combined: dict[int, str] = {}
+        for block_num, block_type in transaction_blocks + update_rewards_blocks + monday_blocks:
+            combined.setdefault(block_num, block_type)
+
+        all_blocks = sorted(combined.items())
         
         # Create a 'Baseline' event to ensure reward calculation always works
         if all_blocks:
@@ -490,8 +792,12 @@ def main():
             all_blocks.insert(0, baseline_block)
         
         if args.csv:
-            writer = csv.writer(sys.stdout, lineterminator='\n')
+            # Block-buffered stdout + chunked writerows keeps the write
+            # syscall count at ~1 per _CSV_FLUSH_ROWS rows instead of 1 per row.
+            csv_out = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", line_buffering=False)
+            writer = csv.writer(csv_out, lineterminator='\n')
             writer.writerow(['block_date', 'block', 'type', 'stlink_balance', 'link_balance', 'lsd_tokens', 'queued_tokens', f'link_price_{args.currency.lower()}' , 'reward_share'])
+            pending_rows = []
         else:
             if not all_blocks:
                  print("No relevant events found after the specified start date.")
@@ -499,63 +805,85 @@ def main():
             # -1 to not count the baseline event in the user-facing summary
             print(f"\n=== Balances for {USER_WALLET_ADDRESS} at {len(all_blocks)-1} relevant blocks ===") 
         
-        previous_stlink_balance_uint = None
-        previous_lsd_tokens_uint = None
-        previous_queued_tokens_uint = None
-        
-        for block_num, block_type in all_blocks:
+        # One ranged request covers every price the loop below can ask for.
+        prefetch_link_prices(int(start_date.timestamp()), int(end_date.timestamp()), args.currency, args.csv)
+
+        # Resolve every block's timestamp up front in a few batched calls.
+        prefetch_block_timestamps([block_num for block_num, _ in all_blocks], args.csv)
+
+        # Previous-block state stays as raw uint256 ints; Decimal conversion
+        # happens only at output time (Decimal ops are far slower than int).
+        previous_stlink_raw = None
+        previous_lsd_raw = None
+        previous_queued_raw = None
+
+        # Fetch every block concurrently; the reward-diff pass below stays
+        # sequential because each row depends on the previous one.
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = [
+                executor.submit(fetch_block, block_num, block_type, args.csv)
+                for block_num, block_type in all_blocks
+            ]
+
+        for (block_num, block_type), future in zip(all_blocks, futures):
             try:
+                fetched = future.result()
+                balances = fetched['balances']
+
                 # Skip printing the baseline row itself, it's only for calculation
                 if block_type == "Baseline":
-                    balances = get_wallet_balances(USER_WALLET_ADDRESS, block_num, args.csv)
-                    previous_stlink_balance_uint = uint256_to_decimal(balances['stlink_balance'])
-                    previous_lsd_tokens_uint = uint256_to_decimal(balances['lsd_tokens'])
-                    previous_queued_tokens_uint = uint256_to_decimal(balances['queued_tokens'])
+                    previous_stlink_raw = balances.stlink
+                    previous_lsd_raw = balances.lsd
+                    previous_queued_raw = balances.queued
                     continue
 
-                block_timestamp = get_block_timestamp(block_num)
+                block_timestamp = fetched['timestamp']
                 block_date = datetime.fromtimestamp(block_timestamp, tz=utc)
                 block_date_str = block_date.strftime("%Y-%m-%d %H:%M:%S")
                 price_date = block_date.strftime("%d-%m-%Y")
-                
-                balances = get_wallet_balances(USER_WALLET_ADDRESS, block_num, args.csv)
-                
-                stlink_balance_uint = uint256_to_decimal(balances['stlink_balance'])
-                lsd_tokens_uint = uint256_to_decimal(balances['lsd_tokens'])
-                queued_tokens_uint = uint256_to_decimal(balances['queued_tokens'])
-                
-                reward = Decimal(0)
+
+                stlink_raw = balances.stlink
+                lsd_raw = balances.lsd
+                queued_raw = balances.queued
+
+                reward_raw = 0
                 if block_type == "Rewards":
-                    if previous_lsd_tokens_uint is not None:
-                       reward = (stlink_balance_uint - previous_stlink_balance_uint) + (lsd_tokens_uint - previous_lsd_tokens_uint) - (previous_queued_tokens_uint - queued_tokens_uint)
-                
-                link_price = get_link_price(price_date, args.currency, args.csv) if block_type == "Rewards" and reward > 0 else 0.0
-                
+                    if previous_lsd_raw is not None:
+                        reward_raw = (stlink_raw - previous_stlink_raw) + (lsd_raw - previous_lsd_raw) - (previous_queued_raw - queued_raw)
+
+                link_price = get_link_price(price_date, args.currency, args.csv) if block_type == "Rewards" and reward_raw > 0 else 0.0
+
                 # Update previous state for the next iteration
-                previous_stlink_balance_uint = stlink_balance_uint
-                previous_lsd_tokens_uint = lsd_tokens_uint
-                previous_queued_tokens_uint = queued_tokens_uint
+                previous_stlink_raw = stlink_raw
+                previous_lsd_raw = lsd_raw
+                previous_queued_raw = queued_raw
+
+                # Format once per row; everything above stayed plain ints.
+                reward = uint256_to_decimal(reward_raw)
 
                 if args.csv:
-                    writer.writerow([
+                    pending_rows.append([
                         block_date_str,
                         block_num,
                         block_type,
-                        str(stlink_balance_uint),
-                        str(uint256_to_decimal(balances['link_balance'])),
-                        str(lsd_tokens_uint),
-                        str(queued_tokens_uint),
+                        str(uint256_to_decimal(stlink_raw)),
+                        str(uint256_to_decimal(balances.link)),
+                        str(uint256_to_decimal(lsd_raw)),
+                        str(uint256_to_decimal(queued_raw)),
                         f"{link_price:.2f}",
-                        f"{reward:.8f}"                        
+                        f"{reward:.8f}"
                     ])
+                    if len(pending_rows) >= _CSV_FLUSH_ROWS:
+                        writer.writerows(pending_rows)
+                        pending_rows.clear()
                 else:
                     print(f"\nBlock {block_num} (Date: {block_date_str}, Type: {block_type})")
                     print(f"Wallet:")
-                    print(f"  stLINK: {stlink_balance_uint}")
-                    print(f"  LINK: {uint256_to_decimal(balances['link_balance'])}")
+                    print(f"  stLINK: {uint256_to_decimal(stlink_raw)}")
+                    print(f"  LINK: {uint256_to_decimal(balances.link)}")
                     print(f"Priority Pool:")
-                    print(f"  stLINK: {lsd_tokens_uint}")
-                    print(f"  LINK: {queued_tokens_uint} (Queued)")
+                    print(f"  stLINK: {uint256_to_decimal(lsd_raw)}")
+                    print(f"  LINK: {uint256_to_decimal(queued_raw)} (Queued)")
                     if block_type == "Rewards":
                         print(f"  LINK Price ({args.currency.upper()}): {link_price:.2f}")
                         print(f"  Reward: {reward:.8f}")
@@ -564,6 +892,11 @@ def main():
                 if not args.csv:
                     print(f"Error processing block {block_num} ({block_type}): {e}")
                 continue
+
+        if args.csv:
+            if pending_rows:
+                writer.writerows(pending_rows)
+            csv_out.flush()
     except ValueError as e:
         if not args.csv:
             print(f"Error: {e}")
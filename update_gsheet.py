@@ -1,13 +1,20 @@
 import sys
 import os
 import csv
+import json
 import re
 import gspread
 import argparse
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from google.oauth2.service_account import Credentials
 import signal
 
+try:
+    import orjson  # C-accelerated JSON; worthwhile for large appendCells payloads
+except ImportError:
+    orjson = None
+
 # --- Robustly handle BrokenPipeError for command-line usage ---
 try:
     signal.signal(signal.SIGPIPE, signal.SIG_DFL)
@@ -32,14 +39,106 @@ PERMISSION_ERROR_EXIT_CODE = 3
 REPORT_WORKSHEET_NAME = "stLink Monthly"
 REPORT_TAB_REWARD_HEADER = "stLink Reward"
 
+# Google Sheets serial-date epoch (day 0).
+SHEETS_EPOCH = datetime(1899, 12, 30)
+
+# Local cache of block IDs already on the sheet; the sheet only ever grows,
+# so a cache validated against the sheet's newest ID saves re-reading the
+# whole ID column on every run.
+ID_CACHE_PATH = os.path.expanduser('~/.cache/stlink_ids.json')
+
+# Cached OAuth access token, reused across invocations until it expires so
+# frequent cron runs skip the token exchange round trip.
+TOKEN_CACHE_PATH = os.path.expanduser('~/.cache/stlink_gcp_token.json')
+GSHEET_SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+
+def _load_id_cache():
+    """Returns the cached set of block IDs, or None if absent/unreadable."""
+    try:
+        with open(ID_CACHE_PATH) as f:
+            return set(json.load(f))
+    except (OSError, ValueError):
+        return None
+
+def _save_id_cache(ids):
+    """Writes the set of known block IDs back to the local cache."""
+    try:
+        os.makedirs(os.path.dirname(ID_CACHE_PATH), exist_ok=True)
+        with open(ID_CACHE_PATH, 'w') as f:
+            json.dump(sorted(ids), f)
+    except OSError as e:
+        print(f"Warning: Could not write ID cache to '{ID_CACHE_PATH}': {e}", file=sys.stderr)
+
+def _newest_id(rows):
+    """Returns the last numeric ID in a fetched column of value rows, or None."""
+    for row in reversed(rows):
+        if row and str(row[0]).strip():
+            try:
+                return int(float(str(row[0]).strip()))
+            except ValueError:
+                return None
+    return None
+
+
+def _client_from_cached_token():
+    """Returns a gspread client built from the cached access token, or None.
+
+    Credentials.from_service_account_file re-parses the JSON key and performs
+    a network token exchange on every invocation; the signed token is usually
+    still valid from the previous run, so persist it until expiry.
+    """
+    try:
+        with open(TOKEN_CACHE_PATH) as f:
+            cached = json.load(f)
+        expiry = datetime.strptime(cached['expiry'], '%Y-%m-%dT%H:%M:%S')
+        if (expiry - datetime.utcnow()).total_seconds() > 60:
+            from google.oauth2.credentials import Credentials as TokenCredentials
+            print("Reusing cached access token.", file=sys.stderr)
+            return gspread.authorize(TokenCredentials(token=cached['token']))
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+def _client_from_service_account():
+    """Returns a gspread client from the service-account key file, caching the token."""
+    creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=GSHEET_SCOPES)
+    gc = gspread.authorize(creds)
+    if creds.token is None:
+        # gspread refreshes lazily on first request; force it now so there is
+        # a token to cache.
+        from google.auth.transport.requests import Request
+        creds.refresh(Request())
+    if creds.token and creds.expiry:
+        try:
+            os.makedirs(os.path.dirname(TOKEN_CACHE_PATH), exist_ok=True)
+            # The token grants sheet access — keep the cache file private.
+            fd = os.open(TOKEN_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'token': creds.token,
+                           'expiry': creds.expiry.strftime('%Y-%m-%dT%H:%M:%S')}, f)
+        except OSError as e:
+            print(f"Warning: Could not write token cache to '{TOKEN_CACHE_PATH}': {e}", file=sys.stderr)
+    return gc
+
+
+# Compiled once at import; anchored to the canonical URL prefix so match()
+# can be used instead of a scan of the whole string.
+_SPREADSHEET_ID_RE = re.compile(r'https?://(?:www\.)?docs\.google\.com/spreadsheets/d/([a-zA-Z0-9_-]+)')
 
 def extract_spreadsheet_id_from_url(url):
-    """Extracts the spreadsheet ID from a Google Sheets URL using regex."""
-    match = re.search(r'/spreadsheets/d/([a-zA-Z0-9-_]+)', url)
+    """Extracts the spreadsheet ID from a Google Sheets URL."""
+    match = _SPREADSHEET_ID_RE.match(url)
     return match.group(1) if match else None
 
+# Single letters cover every column this script touches; the loop below only
+# runs for the AA+ range.
+_COL_LETTERS = [chr(65 + i) for i in range(26)]
+
 def col_index_to_letter(col_index):
     """Converts a 0-indexed column number to its letter representation (e.g., 0 -> A, 26 -> AA)."""
+    if col_index < 26:
+        return _COL_LETTERS[col_index]
     letter = ""
     while col_index >= 0:
         col_index, remainder = divmod(col_index, 26)
@@ -61,11 +160,24 @@ def connect_to_gsheet():
 
     print("Connecting to Google Sheets...", file=sys.stderr)
     try:
-        scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-        creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=scopes)
-        gc = gspread.authorize(creds)
-        spreadsheet = gc.open_by_key(spreadsheet_id)
-        
+        spreadsheet = None
+        gc = _client_from_cached_token()
+        if gc is not None:
+            try:
+                spreadsheet = gc.open_by_key(spreadsheet_id)
+            except Exception:
+                # The recorded expiry is no guarantee: a token can be revoked
+                # or invalidated early, and the cached Credentials carry no
+                # refresh token. Drop the cache and redo the full flow.
+                print("Cached access token was rejected; re-authenticating with the service account.", file=sys.stderr)
+                try:
+                    os.remove(TOKEN_CACHE_PATH)
+                except OSError:
+                    pass
+        if spreadsheet is None:
+            gc = _client_from_service_account()
+            spreadsheet = gc.open_by_key(spreadsheet_id)
+
         try:
             worksheet = spreadsheet.worksheet(WORKSHEET_NAME)
         except gspread.exceptions.WorksheetNotFound:
@@ -87,183 +199,493 @@ def connect_to_gsheet():
         print(f"ERROR DETAILS: {repr(e)}\n", file=sys.stderr)
         sys.exit(1)
 
+def build_cell_rows(rows, date_col_index):
+    """Encode rows as appendCells payload dicts with explicit value types.
+
+    Numbers go out as numberValue and the date column as a serial-date
+    numberValue (rendered by the repeatCell numberFormat), so the server
+    doesn't have to re-parse strings the way values.append USER_ENTERED does.
+    """
+    payload = []
+    for row in rows:
+        values = []
+        for idx, cell in enumerate(row):
+            if idx == date_col_index and isinstance(cell, str):
+                serial = _ts_to_serial(cell)
+                if serial is not None:
+                    values.append({'userEnteredValue': {'numberValue': serial}})
+                    continue
+            if isinstance(cell, (int, float)) and not isinstance(cell, bool):
+                values.append({'userEnteredValue': {'numberValue': cell}})
+            else:
+                values.append({'userEnteredValue': {'stringValue': str(cell)}})
+        payload.append({'values': values})
+    return payload
+
+# Classify numeric strings up front: the old try/except int() -> float()
+# chain raised two exceptions per non-numeric cell, and exception unwinding
+# dominates the per-cell cost on large CSVs.
+_INT_RE = re.compile(r'-?\d+\Z')
+_FLOAT_RE = re.compile(r'-?(\d+\.\d*|\.\d+|\d+)([eE][-+]?\d+)?\Z')
+
+# Timestamp fast path: strptime re-parses its format string and walks locale
+# tables on every call; a compiled regex plus int() on the groups is several
+# times cheaper per row.
+_TS_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2}) (\d{2}):(\d{2}):(\d{2})\Z')
+
+def _ts_to_serial(value):
+    """Sheets serial number for a 'YYYY-MM-DD HH:MM:SS' string, or None."""
+    m = _TS_RE.match(value)
+    if not m:
+        return None
+    y, mo, d, h, mi, s = map(int, m.groups())
+    try:
+        days = (datetime(y, mo, d) - SHEETS_EPOCH).days
+    except ValueError:
+        return None
+    return days + (h * 3600 + mi * 60 + s) / 86400.0
+
 def convert_to_number(value):
     """Convert a string to int or float if it represents a number, else return unchanged."""
-    if not isinstance(value, str) or not value.strip():
+    if not isinstance(value, str):
         return value
-    try:
-        return int(value)
-    except ValueError:
-        try:
-            return float(value)
-        except ValueError:
-            return value
+    s = value.strip()
+    if not s:
+        return value
+    if _INT_RE.match(s):
+        return int(s)
+    if _FLOAT_RE.match(s):
+        return float(s)
+    return value
+
+def _fast_csv_rows(stream):
+    """Yields CSV rows by splitting chunked byte reads on newlines and commas.
+
+    csv.reader runs a quote-aware state machine per character; the tracker's
+    own CSV output never quotes fields, so a plain byte split is enough and
+    much cheaper on very large inputs. Any '\"' in the input raises
+    ValueError so the caller can fall back to the safe parser.
+    """
+    tail = b''
+    while True:
+        chunk = stream.read(1 << 20)
+        if not chunk:
+            break
+        lines = (tail + chunk).split(b'\n')
+        tail = lines.pop()
+        for line in lines:
+            if not line:
+                continue
+            if b'"' in line:
+                raise ValueError("quoted field in input; rerun without --fast-csv")
+            yield line.rstrip(b'\r').decode().split(',')
+    if tail:
+        if b'"' in tail:
+            raise ValueError("quoted field in input; rerun without --fast-csv")
+        yield tail.rstrip(b'\r').decode().split(',')
+
+# Column-specialized converters for the CSV row loop: the cells there are
+# always strings fresh from csv.reader, so the generic isinstance dispatch in
+# convert_to_number can be skipped and the preferred type tried first.
+def _int_cell(value):
+    """Converter for integer columns such as the block number."""
+    s = value.strip()
+    if _INT_RE.match(s):
+        return int(s)
+    if _FLOAT_RE.match(s):
+        return float(s)
+    return value
+
+def _float_cell(value):
+    """Converter for decimal columns (balances, rewards, prices)."""
+    s = value.strip()
+    if _FLOAT_RE.match(s):
+        return float(s)
+    return value
+
+def _batch_update(spreadsheet, requests):
+    """Issues a spreadsheets.batchUpdate, serializing the body with orjson when available.
+
+    gspread routes batch_update through json.dumps; for appends of thousands
+    of cells the pure-Python serializer is the dominant client-side cost, so
+    post pre-serialized bytes directly when orjson is installed.
+    """
+    body = {'requests': requests}
+    if orjson is None:
+        return spreadsheet.batch_update(body)
+    endpoint = f"https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet.id}:batchUpdate"
+    response = spreadsheet.client.request(
+        'post', endpoint,
+        data=orjson.dumps(body),
+        headers={'Content-Type': 'application/json'},
+    )
+    return response.json()
 
 def handle_get_last_date(worksheet):
     """Finds, formats, and prints the latest date from the specified date column."""
-    print(f"Fetching header from '{worksheet.title}' to find '{DATE_COLUMN_NAME}' column...", file=sys.stderr)
+    title = worksheet.title
+    # Rows are appended chronologically, so the latest date lives near the
+    # bottom; fetch the header and the tail of column A (where block_date
+    # lives) in a single values.batchGet round trip.
+    first_row = max(2, worksheet.row_count - 1000)
+    print(f"Fetching header and date column tail from '{title}'...", file=sys.stderr)
     try:
-        header = worksheet.row_values(1)
+        # UNFORMATTED_VALUE skips the server-side formatter and returns the
+        # date column as raw serial doubles instead of rendered strings.
+        response = worksheet.spreadsheet.values_batch_get(
+            [f"'{title}'!1:1", f"'{title}'!A{first_row}:A"],
+            params={'valueRenderOption': 'UNFORMATTED_VALUE',
+                    'dateTimeRenderOption': 'SERIAL_NUMBER'})
     except gspread.exceptions.APIError as e:
-        print(f"Error fetching header: {e}", file=sys.stderr)
+        print(f"Error fetching data: {e}", file=sys.stderr)
         sys.exit(1)
 
+    value_ranges = response.get('valueRanges', [])
+    header = value_ranges[0].get('values', [[]])[0] if value_ranges else []
     if not header:
         print("Sheet appears to be empty. No date to return.", file=sys.stderr)
         return
 
     try:
-        date_col_index = header.index(DATE_COLUMN_NAME) + 1
+        date_col_index = header.index(DATE_COLUMN_NAME)
     except ValueError:
         print(f"Error: Date column '{DATE_COLUMN_NAME}' not found in the sheet header.", file=sys.stderr)
         sys.exit(1)
 
-    print(f"Fetching dates from column {date_col_index}...", file=sys.stderr)
-    dates_str = worksheet.col_values(date_col_index)[1:]
-    
-    last_date = None
-    for date_str in dates_str:
-        if not date_str: continue
-        try:
-            current_date = datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S')
-            if last_date is None or current_date > last_date:
-                last_date = current_date
-        except ValueError:
-            continue
-
-    if last_date:
-        print(last_date.strftime('%Y-%m-%d'))
+    if date_col_index == 0:
+        date_rows = value_ranges[1].get('values', []) if len(value_ranges) > 1 else []
     else:
+        # The date column moved away from A; pay for one extra fetch.
+        col_letter = col_index_to_letter(date_col_index)
+        date_rows = worksheet.get(f"{col_letter}{first_row}:{col_letter}",
+                                  value_render_option='UNFORMATTED_VALUE',
+                                  date_time_render_option='SERIAL_NUMBER')
+
+    if not date_rows and first_row > 2:
+        # row_count is the grid size, not the data extent: a sheet padded
+        # with blank rows below the data leaves the tail window empty even
+        # though older rows hold dates. Fall back to the full column before
+        # concluding there are none.
+        col_letter = col_index_to_letter(date_col_index)
+        date_rows = worksheet.get(f"{col_letter}2:{col_letter}",
+                                  value_render_option='UNFORMATTED_VALUE',
+                                  date_time_render_option='SERIAL_NUMBER')
+
+    # Serial dates compare numerically, so max() needs no parsing at all.
+    serials = [row[0] for row in date_rows if row and isinstance(row[0], (int, float))]
+    if serials:
+        print((SHEETS_EPOCH + timedelta(days=max(serials))).strftime('%Y-%m-%d'))
+        return
+
+    # Legacy sheets may still hold text dates; 'YYYY-MM-DD HH:MM:SS' strings
+    # compare lexicographically in date order, so take the max and parse only
+    # that one value.
+    valid = [row[0] for row in date_rows if row and isinstance(row[0], str) and _TS_RE.match(row[0])]
+    if not valid:
         print("No valid dates found in the column.", file=sys.stderr)
+        return
 
-def handle_update_sheet(worksheet):
+    # The regex filter guarantees the shape, so the date part is simply the
+    # first ten characters — no datetime round trip needed.
+    print(max(valid)[:10])
+
+def handle_update_sheet(worksheet, fast_csv=False):
     """Reads CSV from stdin and appends new, unique rows to the sheet with proper numerical and date types."""
     print("Reading new data from stdin...", file=sys.stderr)
-    stdin_data = sys.stdin.read()
-
-    # --- DIAGNOSTIC DEBUGGING START ---
-    all_lines = stdin_data.strip().splitlines()
-    print("--- DIAGNOSTIC DATA ---", file=sys.stderr)
-    print(f"Total lines read from stdin (including header): {len(all_lines)}", file=sys.stderr)
-    if len(all_lines) > 1:
-        print(f"Last data row read from stdin: {all_lines[-1]}", file=sys.stderr)
+    # Stream stdin row-by-row instead of materializing the whole CSV as a
+    # string, a list of lines and a list of rows all at once.
+    if fast_csv:
+        csv_reader = _fast_csv_rows(sys.stdin.buffer)
     else:
-        print("No data rows were read from stdin.", file=sys.stderr)
-    print("-----------------------", file=sys.stderr)
-    # --- DIAGNOSTIC DEBUGGING END ---
-    
-    if not all_lines or len(all_lines) <= 1:
+        csv_reader = csv.reader(sys.stdin)
+    try:
+        new_header = next(csv_reader)
+    except StopIteration:
         print("No input data received or only a header was found. Exiting.", file=sys.stderr)
         return
 
-    csv_reader = csv.reader(all_lines)
-    new_data_rows = list(csv_reader)
-    new_header = new_data_rows[0]
+    # One dict of header positions replaces the repeated new_header.index()
+    # linear scans below.
+    new_header_idx = {col: i for i, col in enumerate(new_header)}
 
     all_numerical_cols = BASE_NUMERICAL_COLUMNS.copy()
     dynamic_price_col = next((col for col in new_header if col.startswith('link_price_')), None)
-    
+
     if dynamic_price_col:
         print(f"Found dynamic price column in CSV data: '{dynamic_price_col}'", file=sys.stderr)
         all_numerical_cols.append(dynamic_price_col)
     else:
         print("Warning: No column starting with 'link_price_' found in the input CSV.", file=sys.stderr)
-        
-    numerical_col_indices = []
-    try:
-        numerical_col_indices = [new_header.index(col) for col in all_numerical_cols]
-    except ValueError as e:
-        print(f"Warning: A numerical column was not found in the CSV header: {e}", file=sys.stderr)
 
-    try:
-        date_col_index = new_header.index(DATE_COLUMN_NAME)
-    except ValueError:
+    missing_cols = [col for col in all_numerical_cols if col not in new_header_idx]
+    if missing_cols:
+        print(f"Warning: Numerical column(s) not found in the CSV header: {missing_cols}", file=sys.stderr)
+    numerical_col_indices = [new_header_idx[col] for col in all_numerical_cols if col in new_header_idx]
+
+    date_col_index = new_header_idx.get(DATE_COLUMN_NAME)
+    if date_col_index is None:
         print(f"Warning: Date column '{DATE_COLUMN_NAME}' not found in header.", file=sys.stderr)
-        date_col_index = None
-
-    converted_rows = [new_data_rows[0]]
-    for row in new_data_rows[1:]:
-        new_row = row.copy()
-        for col_idx in numerical_col_indices:
-            if len(new_row) > col_idx:
-                new_row[col_idx] = convert_to_number(new_row[col_idx])
-        if date_col_index is not None and len(new_row) > date_col_index and new_row[date_col_index].strip():
-            try:
-                parsed_date = datetime.strptime(new_row[date_col_index], '%Y-%m-%d %H:%M:%S')
-                new_row[date_col_index] = parsed_date.strftime('%Y-%m-%d %H:%M:%S')
-            except ValueError:
-                print(f"Warning: Could not parse date '{new_row[date_col_index]}' in row {row}. Keeping as string.", file=sys.stderr)
-        converted_rows.append(new_row)
 
-    print(f"Fetching existing data from tab '{worksheet.title}'...", file=sys.stderr)
-    existing_data = worksheet.get_all_values()
-    
-    rows_to_append = []
-    if not existing_data:
-        print("Sheet is empty. Adding all new data.", file=sys.stderr)
-        rows_to_append = converted_rows
-    else:
-        existing_header = existing_data[0]
+    # Local bindings for the per-row loop: locals are a fast-path lookup,
+    # whereas module globals and attribute chains are re-resolved on every
+    # iteration.
+    _to_serial = _ts_to_serial
+    _date_idx = date_col_index
+
+    _uid_idx = new_header_idx.get(UNIQUE_ID_COLUMN)
+
+    # Pick each column's converter once instead of dispatching through the
+    # generic convert_to_number per cell; the block column prefers int, the
+    # value columns float.
+    converters = {idx: _float_cell for idx in numerical_col_indices}
+    if _uid_idx is not None:
+        converters[_uid_idx] = _int_cell
+    _conv_items = tuple(converters.items())
+
+    # Overlapping runs can feed the same block twice in one batch; drop exact
+    # duplicates here so they never reach the conversion pass or the API.
+    seen_ids = set()
+
+    def _fetch_existing_ids():
+        """Fetches the sheet's existing block IDs (runs on a worker thread).
+
+        Returns (existing_ids, last_data_row, filter_by_existing, needs_clear)
+        where last_data_row is the last sheet row already holding data
+        (1-based) and needs_clear asks the caller to wipe the inconsistent
+        sheet before appending — deferred so that an empty stdin can never
+        leave the sheet cleared with nothing re-added.
+        """
+        print(f"Fetching existing IDs from tab '{worksheet.title}'...", file=sys.stderr)
+        # One batchGet covers the header row and the ID-column tail ('block'
+        # lives in column B); together with the ID cache this makes the
+        # steady state a single read RPC.
+        tail_first = max(2, worksheet.row_count - 1000)
+        response = worksheet.spreadsheet.values_batch_get(
+            [f"'{worksheet.title}'!1:1", f"'{worksheet.title}'!B{tail_first}:B"],
+            params={'valueRenderOption': 'UNFORMATTED_VALUE'})
+        value_ranges = response.get('valueRanges', [])
+        header = value_ranges[0].get('values', [[]])[0] if value_ranges else []
+
+        if not header:
+            print("Sheet is empty. Adding all new data.", file=sys.stderr)
+            return set(), 0, False, False
+
         try:
-            unique_id_col_index = existing_header.index(UNIQUE_ID_COLUMN)
-            existing_ids = set()
-            for r_idx, row in enumerate(existing_data[1:]):
-                if len(row) > unique_id_col_index and row[unique_id_col_index].strip():
-                    try:
-                        # Robust conversion for existing IDs
-                        existing_ids.add(int(float(row[unique_id_col_index].strip())))
-                    except ValueError:
-                        print(f"Warning: Could not convert existing ID '{row[unique_id_col_index]}' to a number on sheet row {r_idx + 2}. Skipping ID.", file=sys.stderr)
+            unique_id_col_index = header.index(UNIQUE_ID_COLUMN)
+            if _uid_idx is None:
+                raise ValueError(UNIQUE_ID_COLUMN)
+            id_col_letter = col_index_to_letter(unique_id_col_index)
+
+            if id_col_letter == 'B':
+                tail = value_ranges[1].get('values', []) if len(value_ranges) > 1 else []
+            else:
+                # The ID column moved away from B; pay for one extra fetch.
+                tail = worksheet.get(f"{id_col_letter}{tail_first}:{id_col_letter}",
+                                     value_render_option='UNFORMATTED_VALUE')
+
+            last_data_row = 0
+            existing_ids = None
+            cached_ids = _load_id_cache()
+            if cached_ids:
+                # Validate the cache against just the sheet's newest ID; the
+                # full column only has to be re-read if they disagree.
+                sheet_head = _newest_id(tail)
+                if sheet_head is not None and sheet_head == max(cached_ids):
+                    print(f"ID cache is current ({len(cached_ids)} IDs); skipping full column fetch.", file=sys.stderr)
+                    existing_ids = cached_ids
+                    last_data_row = tail_first - 1 + len(tail)
+
+            if existing_ids is None:
+                # Fetch just the unique-ID column rather than every cell of
+                # every column; the diff below only needs the IDs.
+                id_column = worksheet.get(f"{id_col_letter}2:{id_col_letter}",
+                                          value_render_option='UNFORMATTED_VALUE')
+                last_data_row = 1 + len(id_column)
+                # UNFORMATTED_VALUE already delivers numeric cells as ints,
+                # so one comprehension covers the normal case; only text
+                # leftovers (older sheets) take the conversion loop.
+                existing_ids = {row[0] for row in id_column if row and isinstance(row[0], int)}
+                for r_idx, row in enumerate(id_column):
+                    if row and not isinstance(row[0], int) and str(row[0]).strip():
+                        try:
+                            # Robust conversion for existing IDs
+                            existing_ids.add(int(float(str(row[0]).strip())))
+                        except ValueError:
+                            print(f"Warning: Could not convert existing ID '{row[0]}' to a number on sheet row {r_idx + 2}. Skipping ID.", file=sys.stderr)
+                # The raw column is dead weight once the set exists; free it
+                # before the append payload gets built.
+                existing_ids = frozenset(existing_ids)
+                del id_column
 
             print(f"Found {len(existing_ids)} existing unique IDs.", file=sys.stderr)
-            
-            new_unique_id_col_index = new_header.index(UNIQUE_ID_COLUMN)
-            for i, row in enumerate(converted_rows[1:]):
-                if len(row) > new_unique_id_col_index and row[new_unique_id_col_index].strip():
-                    try:
-                        # Robust conversion for new IDs
-                        new_id = int(float(row[new_unique_id_col_index].strip()))
-                        if new_id not in existing_ids:
-                            rows_to_append.append(row)
-                    except ValueError:
-                         print(f"Warning: Could not convert new ID '{row[new_unique_id_col_index]}' to a number on input row {i + 2}. Skipping row.", file=sys.stderr)
+            return existing_ids, last_data_row, True, False
 
         except (ValueError, IndexError):
             print(f"Warning: Could not find '{UNIQUE_ID_COLUMN}' in header or data is inconsistent.", file=sys.stderr)
-            print("Clearing the sheet and adding all new data to ensure consistency.", file=sys.stderr)
-            worksheet.clear()
-            rows_to_append = converted_rows
-    
-    if rows_to_append:
-        # Check if we are appending the header unnecessarily
-        if existing_data and rows_to_append[0] == existing_header:
-             rows_to_append.pop(0) # Remove header if sheet is not empty
+            print("The sheet will be cleared and all new data added to ensure consistency.", file=sys.stderr)
+            return set(), 0, False, True
+
+    pending_rows = []
+    rows_read = 0
+    last_row = None
+
+    def _drain_stdin():
+        nonlocal rows_read, last_row
+        for row in csv_reader:
+            if not row:
+                continue
+            rows_read += 1
+            last_row = row
+            if _uid_idx is not None and _uid_idx < len(row):
+                uid = row[_uid_idx]
+                if uid in seen_ids:
+                    continue
+                seen_ids.add(uid)
+            pending_rows.append(row)
+
+    cached_ids = _load_id_cache()
+    if cached_ids and _uid_idx is not None:
+        # A warm ID cache can prove a cron re-run is a no-op cheaply: cached
+        # IDs only ever come from successful appends, so if every block on
+        # stdin is in the cache, it is already on the sheet — provided the
+        # sheet still is the one the cache was built from.
+        _drain_stdin()
+        if pending_rows:
+            try:
+                all_known = all(
+                    _uid_idx < len(row) and int(float(row[_uid_idx].strip())) in cached_ids
+                    for row in pending_rows)
+            except ValueError:
+                all_known = False
+            if all_known:
+                # The cache file can outlive its sheet (cleared, trimmed or
+                # replaced out-of-band), so spend one tail read confirming
+                # the sheet's newest ID still matches before declaring the
+                # run a no-op; on any disagreement fall through to the full
+                # fetch-and-filter path below.
+                tail_first = max(2, worksheet.row_count - 1000)
+                try:
+                    tail = worksheet.get(f"B{tail_first}:B",
+                                         value_render_option='UNFORMATTED_VALUE')
+                except gspread.exceptions.APIError:
+                    tail = []
+                if _newest_id(tail) == max(cached_ids):
+                    print(f"All {len(pending_rows)} block(s) from stdin are already on the sheet. Nothing to do.", file=sys.stderr)
+                    return
+                print("Local ID cache disagrees with the sheet; re-checking against the full ID column.", file=sys.stderr)
+        existing_ids, last_data_row, filter_by_existing, needs_clear = _fetch_existing_ids()
+    else:
+        # No usable cache: the Google round trip and the stdin drain are
+        # independent I/O, so fetch the existing IDs on a worker thread while
+        # the CSV streams in. Rows are buffered raw and converted only after
+        # the filter below, so blocks already on the sheet never pay
+        # conversion cost.
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            ids_future = pool.submit(_fetch_existing_ids)
+            _drain_stdin()
+            existing_ids, last_data_row, filter_by_existing, needs_clear = ids_future.result()
+
+    # An empty or just-cleared sheet needs the header row re-sent.
+    include_header = last_data_row == 0
+    rows_to_append = [new_header] if include_header else []
+    for row in pending_rows:
+        if filter_by_existing:
+            if _uid_idx is None or _uid_idx >= len(row):
+                continue
+            uid_s = row[_uid_idx].strip()
+            if not uid_s:
+                continue
+            try:
+                # Robust conversion for new IDs
+                if int(float(uid_s)) in existing_ids:
+                    continue
+            except ValueError:
+                print(f"Warning: Could not convert new ID '{row[_uid_idx]}' to a number. Skipping row.", file=sys.stderr)
+                continue
+        # Both CSV readers allocate a fresh list per row, so it can be
+        # mutated in place — no defensive copy needed.
+        row_len = len(row)
+        for col_idx, conv in _conv_items:
+            # Skip empty cells here so the converter isn't even called.
+            if col_idx < row_len and row[col_idx]:
+                row[col_idx] = conv(row[col_idx])
+        if _date_idx is not None and _date_idx < row_len and row[_date_idx].strip():
+            # Store the serial number directly; the server then keeps the
+            # canonical double without ever parsing a date string.
+            serial = _to_serial(row[_date_idx])
+            if serial is not None:
+                row[_date_idx] = serial
+            else:
+                print(f"Warning: Could not parse date '{row[_date_idx]}' in row {row}. Keeping as string.", file=sys.stderr)
+        rows_to_append.append(row)
 
-        if not rows_to_append:
-             print("No new rows to add. The sheet is already up-to-date.", file=sys.stderr)
-             return
+    # --- DIAGNOSTIC DEBUGGING START ---
+    print("--- DIAGNOSTIC DATA ---", file=sys.stderr)
+    print(f"Total data rows read from stdin (excluding header): {rows_read}", file=sys.stderr)
+    if last_row is not None:
+        print(f"Last data row read from stdin: {last_row}", file=sys.stderr)
+    else:
+        print("No data rows were read from stdin.", file=sys.stderr)
+    print("-----------------------", file=sys.stderr)
+    # --- DIAGNOSTIC DEBUGGING END ---
 
+    if rows_read == 0:
+        print("No input data received or only a header was found. Exiting.", file=sys.stderr)
+        return
+
+    if include_header and len(rows_to_append) == 1:
+        rows_to_append = []
+
+    if rows_to_append:
+        if needs_clear:
+            # Deferred from _fetch_existing_ids: only wipe the inconsistent
+            # sheet now that there is data to replace it with.
+            print("Clearing the sheet before re-adding all data.", file=sys.stderr)
+            worksheet.clear()
         print(f"Appending {len(rows_to_append)} new rows...", file=sys.stderr)
-        worksheet.append_rows(rows_to_append, value_input_option='USER_ENTERED')
-        
-        if date_col_index is not None:
-            spreadsheet = worksheet.spreadsheet
-            sheet_id = worksheet.id
-            requests = [
+        # One batchUpdate carries both the appended cells and the date
+        # format instead of a values.append plus a second round trip.
+        requests = [
+            {
+                'appendCells': {
+                    'sheetId': worksheet.id,
+                    'rows': build_cell_rows(rows_to_append, date_col_index),
+                    'fields': 'userEnteredValue'
+                }
+            }
+        ]
+        # The date format is applied once, over the unbounded column, when the
+        # sheet is first populated (and again after a clear-and-reload).
+        # Appended rows inherit it, so steady-state runs send no format
+        # request at all.
+        if date_col_index is not None and last_data_row == 0:
+            print(f"Applying date format to column '{DATE_COLUMN_NAME}'...", file=sys.stderr)
+            requests.append(
                 {
                     'repeatCell': {
                         'range': {
-                            'sheetId': sheet_id, 'startRowIndex': 1, 'endRowIndex': 1000,
+                            'sheetId': worksheet.id, 'startRowIndex': 1,
                             'startColumnIndex': date_col_index, 'endColumnIndex': date_col_index + 1
                         },
                         'cell': {'userEnteredFormat': {'numberFormat': {'type': 'DATE', 'pattern': 'yyyy-mm-dd hh:mm:ss'}}},
                         'fields': 'userEnteredFormat.numberFormat'
                     }
                 }
-            ]
-            print(f"Applying date format to column '{DATE_COLUMN_NAME}'...", file=sys.stderr)
-            spreadsheet.batch_update({'requests': requests})
-        
+            )
+        _batch_update(worksheet.spreadsheet, requests)
+
+        # Fold the appended IDs into the local cache so the next run can skip
+        # the full column fetch.
+        if _uid_idx is not None:
+            appended_ids = set()
+            for row in rows_to_append:
+                if len(row) > _uid_idx:
+                    try:
+                        appended_ids.add(int(float(str(row[_uid_idx]).strip())))
+                    except ValueError:
+                        pass  # header row or malformed ID
+            _save_id_cache(existing_ids | appended_ids)
+
         print("Successfully updated the Google Sheet.", file=sys.stderr)
     else:
         print("No new rows to add. The sheet is already up-to-date.", file=sys.stderr)
@@ -284,10 +706,57 @@ def get_currency_symbol(header_name):
     }
     return symbols.get(currency_code, '$')
 
-def handle_setup_report_tab(spreadsheet, source_tab_name):
+def _monthly_reward_cells(source_worksheet):
+    """Aggregates the source tab's rewards per calendar month.
+
+    Returns updateCells row dicts for the report tab's reward column: the
+    monthly total on the last row of each month, blanks elsewhere (the same
+    shape the old SUMIF formula produced).
+    """
+    date_col, reward_col = source_worksheet.batch_get(
+        ["A2:A", "I2:I"], major_dimension='COLUMNS')
+    dates = date_col[0] if date_col else []
+    rewards = reward_col[0] if reward_col else []
+
+    month_sums = {}
+    row_months = []
+    for i, date_str in enumerate(dates):
+        month = date_str[:7]  # 'YYYY-MM'
+        row_months.append(month)
+        if i < len(rewards) and rewards[i]:
+            try:
+                month_sums[month] = month_sums.get(month, 0.0) + float(rewards[i])
+            except ValueError:
+                pass
+    last_row_of_month = {month: i for i, month in enumerate(row_months)}
+    reward_cells = []
+    for i, month in enumerate(row_months):
+        if last_row_of_month[month] == i:
+            reward_cells.append({'values': [{'userEnteredValue': {'numberValue': month_sums.get(month, 0.0)}}]})
+        else:
+            reward_cells.append({'values': [{'userEnteredValue': {'stringValue': ''}}]})
+    return reward_cells
+
+def _report_tab_configured(report_worksheet, query_formula, price_formula, total_formula, apy_formula):
+    """Returns True when the report tab already carries exactly these formulas."""
+    try:
+        grid = report_worksheet.get('A1:K2', value_render_option='FORMULA')
+    except gspread.exceptions.APIError:
+        return False
+
+    def cell(r, c):
+        try:
+            return grid[r][c]
+        except IndexError:
+            return ''
+
+    return (cell(0, 0) == query_formula and cell(1, 7) == price_formula
+            and cell(1, 9) == total_formula and cell(1, 10) == apy_formula)
+
+def handle_setup_report_tab(spreadsheet, source_tab_name, force=False):
     """Creates/configures the 'Monthly Report' tab, dynamically finding the price column."""
     print(f"Attempting to set up the '{REPORT_WORKSHEET_NAME}' tab...", file=sys.stderr)
-    
+
     source_worksheet = spreadsheet.worksheet(source_tab_name)
     header = source_worksheet.row_values(1)
     if not header:
@@ -304,59 +773,107 @@ def handle_setup_report_tab(spreadsheet, source_tab_name):
     price_col_letter = col_index_to_letter(price_col_index)
     print(f"Found price column '{price_col_name}' in source tab at column {price_col_letter}.", file=sys.stderr)
 
+    # --- Define Formulas ---
+    query_formula = f"=QUERY('{source_tab_name}'!A:G, \"SELECT * WHERE A IS NOT NULL\")"
+    price_formula = f"=ARRAYFORMULA('{source_tab_name}'!{price_col_letter}2:{price_col_letter})"
+    total_formula = f"=ARRAYFORMULA(IFERROR(ROUND(I2:I*H2:H,2)))"
+    # ***IMPROVED FORMULA***: Prevents #DIV/0! errors if token counts are zero.
+    apy_formula = f"=ARRAYFORMULA(IF((D2:D+F2:F)>0, (1 + I2:I/(D2:D+F2:F))^12 - 1, IFERROR(1/0)))"
+
+    just_created = False
     try:
         report_worksheet = spreadsheet.worksheet(REPORT_WORKSHEET_NAME)
-        print(f"Found existing tab '{REPORT_WORKSHEET_NAME}'. It will be cleared and reconfigured.", file=sys.stderr)
     except gspread.exceptions.WorksheetNotFound:
         print(f"Tab '{REPORT_WORKSHEET_NAME}' not found. Creating it...", file=sys.stderr)
         report_worksheet = spreadsheet.add_worksheet(title=REPORT_WORKSHEET_NAME, rows=1000, cols=26)
+        just_created = True
+    else:
+        if not force and _report_tab_configured(report_worksheet, query_formula, price_formula, total_formula, apy_formula):
+            # Everything structural is identical; the only thing that can be
+            # stale is the static monthly-reward column, so refresh just that.
+            print("Report tab already configured; refreshing monthly totals only (use --force to rebuild).", file=sys.stderr)
+            reward_cells = _monthly_reward_cells(source_worksheet)
+            if reward_cells:
+                spreadsheet.batch_update({'requests': [
+                    {'updateCells': {'rows': reward_cells, 'fields': 'userEnteredValue',
+                                     'start': {'sheetId': report_worksheet.id, 'rowIndex': 1, 'columnIndex': 8}}}
+                ]})
+            print(f"Successfully refreshed tab '{REPORT_WORKSHEET_NAME}'.", file=sys.stderr)
+            return
+        print(f"Found existing tab '{REPORT_WORKSHEET_NAME}'. It will be cleared and reconfigured.", file=sys.stderr)
 
     report_sheet_id = report_worksheet.id
+    # Bound format ranges by the source data's actual extent rather than a
+    # hard-coded 1000 rows — but never past the report tab's own grid, which
+    # keeps its creation-time size and is what the ranges actually target;
+    # exceeding it makes the API reject the whole batch.
+    format_end_row = max(2, min(source_worksheet.row_count, report_worksheet.row_count))
     requests = []
 
-    spreadsheet_metadata = spreadsheet.fetch_sheet_metadata()
-    sheet_info = next((s for s in spreadsheet_metadata['sheets'] if s['properties']['sheetId'] == report_sheet_id), None)
-    if sheet_info and 'slicers' in sheet_info:
-        for slicer in sheet_info['slicers']:
-            requests.append({'deleteEmbeddedObject': {'objectId': slicer['slicerId']}})
+    # A tab created moments ago can't hold slicers or stale values, so the
+    # metadata round trip and the clear are only needed for pre-existing tabs.
+    if not just_created:
+        spreadsheet_metadata = spreadsheet.fetch_sheet_metadata()
+        sheet_info = next((s for s in spreadsheet_metadata['sheets'] if s['properties']['sheetId'] == report_sheet_id), None)
+        if sheet_info and 'slicers' in sheet_info:
+            for slicer in sheet_info['slicers']:
+                requests.append({'deleteEmbeddedObject': {'objectId': slicer['slicerId']}})
 
-    report_worksheet.clear()
-
-    # --- Define Formulas and Formats ---
-    query_formula = f"=QUERY('{source_tab_name}'!A:G, \"SELECT * WHERE A IS NOT NULL\")"       
-    reward_formula = (
-        f"=ARRAYFORMULA(IF((A2:A <> \"\") * (TEXT(A2:A, \"YYYY-MM\") <> TEXT(A3:A, \"YYYY-MM\")), "
-        f"SUMIF(TEXT(A2:A, \"YYYY-MM\"), TEXT(A2:A, \"YYYY-MM\"), '{source_tab_name}'!I2:I), \"\"))"
-    )
-    price_formula = f"=ARRAYFORMULA('{source_tab_name}'!{price_col_letter}2:{price_col_letter})"
-    total_formula = f"=ARRAYFORMULA(IFERROR(ROUND(I2:I*H2:H,2)))"
-    # ***IMPROVED FORMULA***: Prevents #DIV/0! errors if token counts are zero.
-    apy_formula = f"=ARRAYFORMULA(IF((D2:D+F2:F)>0, (1 + I2:I/(D2:D+F2:F))^12 - 1, IFERROR(1/0)))"
+        report_worksheet.clear()
 
+    # Pre-aggregate monthly rewards in Python: the old SUMIF-inside-
+    # ARRAYFORMULA made Sheets recompute an O(n^2) text-month aggregation on
+    # every open; static values leave formulas only where live prices flow.
+    print("Aggregating monthly rewards from the source tab...", file=sys.stderr)
+    reward_cells = _monthly_reward_cells(source_worksheet)
 
     currency_symbol = get_currency_symbol(price_col_name)
     currency_format_pattern = f'"{currency_symbol}"#,##0.00'
     print(f"Using currency symbol '{currency_symbol}' for formatting.", file=sys.stderr)
 
+    def _formula(f):
+        return {'userEnteredValue': {'formulaValue': f}}
+
+    def _text(s):
+        return {'userEnteredValue': {'stringValue': s}}
+
+    # All the formula/header cells live in A1:K2, so one updateCells with a
+    # two-row grid replaces seven single-cell requests. The blank entries
+    # cover cells the QUERY spill fills in (the tab was just cleared).
+    grid_rows = [
+        {'values': [_formula(query_formula)] + [{}] * 7 + [
+            _text(REPORT_TAB_REWARD_HEADER),
+            _text(f'Monthly Reward {currency_symbol}'),
+            _text('Est APY'),
+        ]},
+        {'values': [{}] * 7 + [_formula(price_formula), {}, _formula(total_formula), _formula(apy_formula)]},
+    ]
+
     # --- Build Batch Update Request ---
-    requests.extend([
-        {'updateCells': {'rows': [{'values': [{'userEnteredValue': {'formulaValue': query_formula}}]}], 'fields': 'userEnteredValue', 'start': {'sheetId': report_sheet_id, 'rowIndex': 0, 'columnIndex': 0}}},
-        {'updateCells': {'rows': [{'values': [{'userEnteredValue': {'formulaValue': price_formula}}]}], 'fields': 'userEnteredValue', 'start': {'sheetId': report_sheet_id, 'rowIndex': 1, 'columnIndex': 7}}},
-        {'updateCells': {'rows': [{'values': [{'userEnteredValue': {'formulaValue': reward_formula}}]}], 'fields': 'userEnteredValue', 'start': {'sheetId': report_sheet_id, 'rowIndex': 1, 'columnIndex': 8}}},
-        {'updateCells': {'rows': [{'values': [{'userEnteredValue': {'formulaValue': total_formula}}]}], 'fields': 'userEnteredValue', 'start': {'sheetId': report_sheet_id, 'rowIndex': 1, 'columnIndex': 9}}},
-        {'updateCells': {'rows': [{'values': [{'userEnteredValue': {'formulaValue': apy_formula}}]}], 'fields': 'userEnteredValue', 'start': {'sheetId': report_sheet_id, 'rowIndex': 1, 'columnIndex': 10}}},
-        
-        {'updateCells': {'rows': [{'values': [{'userEnteredValue': {'stringValue': REPORT_TAB_REWARD_HEADER}}]}], 'fields': 'userEnteredValue', 'start': {'sheetId': report_sheet_id, 'rowIndex': 0, 'columnIndex': 8}}},
-        {'updateCells': {'rows': [{'values': [{'userEnteredValue': {'stringValue': f'Monthly Reward {currency_symbol}'}}]}], 'fields': 'userEnteredValue', 'start': {'sheetId': report_sheet_id, 'rowIndex': 0, 'columnIndex': 9}}},
-        {'updateCells': {'rows': [{'values': [{'userEnteredValue': {'stringValue': 'Est APY'}}]}], 'fields': 'userEnteredValue', 'start': {'sheetId': report_sheet_id, 'rowIndex': 0, 'columnIndex': 10}}},
-        
-        {'repeatCell': {'range': {'sheetId': report_sheet_id, 'startRowIndex': 1, 'endRowIndex': 1000, 'startColumnIndex': 0, 'endColumnIndex': 1}, 'cell': {'userEnteredFormat': {'numberFormat': {'type': 'DATE', 'pattern': 'yyyy mmm'}}}, 'fields': 'userEnteredFormat.numberFormat'}},
-        {'repeatCell': {'range': {'sheetId': report_sheet_id, 'startRowIndex': 1, 'endRowIndex': 1000, 'startColumnIndex': 7, 'endColumnIndex': 8}, 'cell': {'userEnteredFormat': {'numberFormat': {'type': 'CURRENCY', 'pattern': currency_format_pattern}}}, 'fields': 'userEnteredFormat.numberFormat'}},
-        {'repeatCell': {'range': {'sheetId': report_sheet_id, 'startRowIndex': 1, 'endRowIndex': 1000, 'startColumnIndex': 8, 'endColumnIndex': 9}, 'cell': {'userEnteredFormat': {'numberFormat': {'type': 'NUMBER', 'pattern': '0.000'}}}, 'fields': 'userEnteredFormat.numberFormat'}},
-        {'repeatCell': {'range': {'sheetId': report_sheet_id, 'startRowIndex': 1, 'endRowIndex': 1000, 'startColumnIndex': 9, 'endColumnIndex': 10}, 'cell': {'userEnteredFormat': {'numberFormat': {'type': 'CURRENCY', 'pattern': currency_format_pattern}}}, 'fields': 'userEnteredFormat.numberFormat'}},
-        {'repeatCell': {'range': {'sheetId': report_sheet_id, 'startRowIndex': 1, 'endRowIndex': 1000, 'startColumnIndex': 10, 'endColumnIndex': 11}, 'cell': {'userEnteredFormat': {'numberFormat': {'type': 'PERCENT', 'pattern': '#0.00%'}}}, 'fields': 'userEnteredFormat.numberFormat'}}
-    ])
-    
+    requests.append(
+        {'updateCells': {'rows': grid_rows, 'fields': 'userEnteredValue', 'start': {'sheetId': report_sheet_id, 'rowIndex': 0, 'columnIndex': 0}}}
+    )
+
+    # Column number formats, spec-driven; the two currency columns share one
+    # format dict so adjusting the pattern touches a single place.
+    currency_format = {'type': 'CURRENCY', 'pattern': currency_format_pattern}
+    column_formats = [
+        (0, {'type': 'DATE', 'pattern': 'yyyy mmm'}),
+        (7, currency_format),
+        (8, {'type': 'NUMBER', 'pattern': '0.000'}),
+        (9, currency_format),
+        (10, {'type': 'PERCENT', 'pattern': '#0.00%'}),
+    ]
+    for col_idx, number_format in column_formats:
+        requests.append({'repeatCell': {
+            'range': {'sheetId': report_sheet_id, 'startRowIndex': 1, 'endRowIndex': format_end_row,
+                      'startColumnIndex': col_idx, 'endColumnIndex': col_idx + 1},
+            'cell': {'userEnteredFormat': {'numberFormat': number_format}},
+            'fields': 'userEnteredFormat.numberFormat'}})
+
+    if reward_cells:
+        requests.append({'updateCells': {'rows': reward_cells, 'fields': 'userEnteredValue', 'start': {'sheetId': report_sheet_id, 'rowIndex': 1, 'columnIndex': 8}}})
+
     # ***CORRECTED SLICER***: Uses a condition to filter for numbers > 0, which correctly
     # excludes blanks, text, errors, and zero values.
     print("Adding slicer to filter for monthly rewards greater than zero...", file=sys.stderr)
@@ -364,7 +881,8 @@ def handle_setup_report_tab(spreadsheet, source_tab_name):
         'addSlicer': {
             'slicer': {
                 'spec': {
-                    'dataRange': {'sheetId': report_sheet_id, 'startColumnIndex': 0, 'endColumnIndex': 9},
+                    'dataRange': {'sheetId': report_sheet_id, 'startRowIndex': 0, 'endRowIndex': format_end_row,
+                                  'startColumnIndex': 0, 'endColumnIndex': 9},
                     'columnIndex': 8,
                     'title': "Filter by Reward",
                     'filterCriteria': {
@@ -394,6 +912,8 @@ def main():
     parser = argparse.ArgumentParser(description="Update a Google Sheet from CSV data, get the last entry date, or set up a report tab.")
     parser.add_argument('--get-last-date', action='store_true', help="Print the latest date from the 'block_date' column and exit.")
     parser.add_argument('--setup-report-tab', action='store_true', help="Create and configure the 'Monthly Report' summary tab.")
+    parser.add_argument('--fast-csv', action='store_true', help="Parse stdin with a byte-level splitter (input must contain no quoted fields).")
+    parser.add_argument('--force', action='store_true', help="With --setup-report-tab: rebuild the report tab even if it is already configured.")
     args = parser.parse_args()
 
     worksheet = connect_to_gsheet()
@@ -403,9 +923,9 @@ def main():
     elif args.setup_report_tab:
         spreadsheet = worksheet.spreadsheet
         source_tab_name = worksheet.title
-        handle_setup_report_tab(spreadsheet, source_tab_name)
+        handle_setup_report_tab(spreadsheet, source_tab_name, force=args.force)
     else:
-        handle_update_sheet(worksheet)
+        handle_update_sheet(worksheet, fast_csv=args.fast_csv)
 
 if __name__ == "__main__":
     try: